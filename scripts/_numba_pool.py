@@ -0,0 +1,18 @@
+"""
+Optional Numba support shared by the texture generator scripts.
+"""
+
+# njit is None when numba isn't installed; callers fall back to NumPy
+try:
+    from numba import njit, prange, set_num_threads
+except ImportError:
+    njit = prange = None
+
+def init_pool_worker():
+    """multiprocessing.Pool initializer that pins Numba to one thread.
+
+    The pool already runs one material per CPU, so a worker whose prange
+    loops also fanned out to every CPU would oversubscribe the machine.
+    """
+    if njit is not None:
+        set_num_threads(1)
@@ -1,21 +1,32 @@
+import mmap
 import os
+from contextlib import nullcontext
 
 file_path = r"examples/unified_showcase/src/main.rs"
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+def context(mm, idx):
+    # Only decode the ~100 bytes around the hit, not the whole file
+    return mm[max(idx - 50, 0):idx + 50].decode('utf-8', errors='replace')
 
-idx = content.find("create_plane_mesh(100.0, water_mat)")
-print(f"Found at index: {idx}")
+with open(file_path, 'rb') as f:
+    # mmap rejects zero-length files; scan b'' instead so an empty file is
+    # reported as not containing the string
+    if os.fstat(f.fileno()).st_size == 0:
+        buf = nullcontext(b'')
+    else:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with buf as mm:
+        idx = mm.find(b"create_plane_mesh(100.0, water_mat)")
+        print(f"Found at index: {idx}")
 
-if idx != -1:
-    print("Context:")
-    print(content[idx-50:idx+50])
-else:
-    print("String not found in content.")
-    # Print some potential near matches
-    print("Checking for create_plane_mesh...")
-    idx2 = content.find("create_plane_mesh")
-    print(f"Found generic at: {idx2}")
-    if idx2 != -1:
-         print(content[idx2-50:idx2+50])
+        if idx != -1:
+            print("Context:")
+            print(context(mm, idx))
+        else:
+            print("String not found in content.")
+            # Print some potential near matches
+            print("Checking for create_plane_mesh...")
+            idx2 = mm.find(b"create_plane_mesh")
+            print(f"Found generic at: {idx2}")
+            if idx2 != -1:
+                 print(context(mm, idx2))
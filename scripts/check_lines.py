@@ -1,12 +1,41 @@
-import os
+import argparse
+from itertools import islice
 
 file_path = r"examples/unified_showcase/src/main.rs"
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
-    # Print lines around 747
-    start = 740
-    end = 760
-    for i in range(start, end):
-        if i < len(lines):
-            print(f"{i+1}: {lines[i].rstrip()}")
+def show(windows, file_path=file_path):
+    """Print each (start, end) window of 1-based, inclusive line numbers.
+
+    The file is opened and scanned once, however many windows are requested.
+    """
+    windows = sorted(windows)
+    last = max(end for _, end in windows)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(islice(f, last), start=1):
+            for start, end in windows:
+                if start <= i <= end:
+                    print(f"{i}: {line.rstrip()}")
+                    break
+
+def main():
+    parser = argparse.ArgumentParser(description="Print line windows from a source file")
+    parser.add_argument('--file', default=file_path, help='File to read')
+    parser.add_argument('--start', type=int, action='append', help='First line of a window (repeatable)')
+    parser.add_argument('--end', type=int, action='append',
+                        help='Last line of a window (repeatable; default: start + 19)')
+    args = parser.parse_args()
+
+    if args.end and not args.start:
+        parser.error('--end requires --start')
+    # Default: lines around 747
+    starts = args.start or [741]
+    ends = args.end or [start + 19 for start in starts]
+    if len(starts) != len(ends):
+        parser.error('--start and --end must be given the same number of times')
+    for start, end in zip(starts, ends):
+        if start > end:
+            parser.error(f'window start {start} is after its end {end}')
+    show(list(zip(starts, ends)), args.file)
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,28 @@
-import re  
-  
-with open('astraweave-net-ecs/src/lib.rs', 'r', encoding='utf-8') as f:  
-    content = f.read()  
-  
-content = re.sub(r"while let Some\(\(entity, client\)\) = q\.next\(\) \{", "for (entity, client) in q {", content)  
-content = re.sub(r"while let Some\(\(entity, authority\)\) = q\.next\(\) \{", "for (entity, authority) in q {", content)  
-content = re.sub(r"for \(_client_id, sender\) in ^&authority\.connected_clients \{", "for sender in authority.connected_clients.values() {", content)  
-  
-with open('astraweave-net-ecs/src/lib.rs', 'w', encoding='utf-8') as f:  
-    f.write(content)  
-  
-print("Fixed all clippy issues") 
+import mmap
+import os
+import re
+
+file_path = 'astraweave-net-ecs/src/lib.rs'
+
+# Only decode and rewrite the file if one of the patterns can possibly match
+# (mmap rejects a zero-length file, and an empty file has nothing to fix)
+with open(file_path, 'rb') as f:
+    needs_fix = False
+    if os.fstat(f.fileno()).st_size != 0:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            needs_fix = mm.find(b'= q.next() {') != -1 or mm.find(b'connected_clients {') != -1
+
+if not needs_fix:
+    print("No clippy issues to fix")
+else:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    content = re.sub(r"while let Some\(\(entity, client\)\) = q\.next\(\) \{", "for (entity, client) in q {", content)
+    content = re.sub(r"while let Some\(\(entity, authority\)\) = q\.next\(\) \{", "for (entity, authority) in q {", content)
+    content = re.sub(r"for \(_client_id, sender\) in ^&authority\.connected_clients \{", "for sender in authority.connected_clients.values() {", content)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    print("Fixed all clippy issues")
@@ -1,13 +1,29 @@
-import
-re
-  
-with open('astraweave-render-bevy/src/render/shadow.rs', 'r', encoding='utf-8') as f:  
-    content = f.read()  
-  
-old = "        for i in 1..CASCADE_COUNT {\n            let ratio = i as f32 / CASCADE_COUNT as f32;\n            // Logarithmic distribution (better quality near camera)\n            split_distances[i] = camera_near * (camera_far / camera_near).powf(ratio);\n        }"  
-new = "        for (i, split_distance) in split_distances.iter_mut().enumerate().take(CASCADE_COUNT).skip(1) {\n            let ratio = i as f32 / CASCADE_COUNT as f32;\n            // Logarithmic distribution (better quality near camera)\n            *split_distance = camera_near * (camera_far / camera_near).powf(ratio);\n        }"  
-content = content.replace(old, new)  
-  
-with open('astraweave-render-bevy/src/render/shadow.rs', 'w', encoding='utf-8') as f:  
-    f.write(content)  
-print('Fixed')  
+import mmap
+import os
+
+file_path = 'astraweave-render-bevy/src/render/shadow.rs'
+
+old = "        for i in 1..CASCADE_COUNT {\n            let ratio = i as f32 / CASCADE_COUNT as f32;\n            // Logarithmic distribution (better quality near camera)\n            split_distances[i] = camera_near * (camera_far / camera_near).powf(ratio);\n        }"
+new = "        for (i, split_distance) in split_distances.iter_mut().enumerate().take(CASCADE_COUNT).skip(1) {\n            let ratio = i as f32 / CASCADE_COUNT as f32;\n            // Logarithmic distribution (better quality near camera)\n            *split_distance = camera_near * (camera_far / camera_near).powf(ratio);\n        }"
+
+# Check the raw bytes for the loop header first (a single line, so CRLF
+# files still match) and only decode the file when it may need editing
+# Empty files are skipped, since mmap can't map zero bytes
+with open(file_path, 'rb') as f:
+    found = False
+    if os.fstat(f.fileno()).st_size != 0:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            found = mm.find(b'for i in 1..CASCADE_COUNT {') != -1
+
+if found:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    found = old in content
+
+if found:
+    content = content.replace(old, new)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    print('Fixed')
+else:
+    print('Cascade split loop not found')
@@ -1,14 +1,22 @@
+import mmap
 import os
 
 file_path = r"examples/unified_showcase/src/main.rs"
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
-
 old_level = 'let water_level = base_height - 2.0;'
 new_level = 'let water_level = base_height + 8.0;'
 
-if old_level in content:
+# Check the raw bytes first so the file is only decoded when it needs editing
+# (an empty file can't be mapped and can't contain the line)
+with open(file_path, 'rb') as f:
+    found = False
+    if os.fstat(f.fileno()).st_size != 0:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            found = mm.find(old_level.encode('utf-8')) != -1
+
+if found:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
     content = content.replace(old_level, new_level)
     print("Fixed water level.")
     with open(file_path, 'w', encoding='utf-8') as f:
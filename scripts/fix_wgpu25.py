@@ -1,116 +1,123 @@
 #!/usr/bin/env python3
 """Fix WGPU 25.0 breaking changes across the codebase."""
 
+import mmap
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def fix_entry_point(content):
-    """Wrap entry_point strings in Some()."""
-    # Match entry_point: "string" and wrap in Some()
-    return re.sub(
-        r'(entry_point:)\s*"([^"]+)"',
-        r'\1 Some("\2")',
-        content
-    )
+# Independent, non-overlapping fixes share one pass over the file. Each
+# alternative is wrapped in a named group so m.lastgroup says which matched.
+_SIMPLE_FIXES_RE = re.compile(
+    r'(?P<entry_point>entry_point:\s*"(?P<ep_name>[^"]+)")'
+    r'|(?P<texture_view>(?P<tvd_head>wgpu::TextureViewDescriptor\s*\{\s*\n)(?P<tvd_indent>\s+)label:)'
+    r'|(?P<memory_hints>memory_hints:\s*wgpu::MemoryHints::default\(\),)'
+    r'|(?P<request_adapter>(?P<ra_call>\.request_adapter\([^)]+\))\s*\.await\s*\.ok_or_else\([^)]+\)\?)'
+    r'|(?P<maintain>wgpu::Maintain::)'
+)
+_REQUIRED_LIMITS_RE = re.compile(r'(required_limits:\s*wgpu::Limits::[^,]+,)\s*\n(\s*)\}')
+_MULTIVIEW_RE = re.compile(r'(multiview:\s*[^,\n]+,)\s*\n(\s*)\}')
+_FRAGMENT_LAST_RE = re.compile(
+    r'(fragment:\s*Some\(\s*[^\{]+\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}\s*\),)\s*\n(\s*)\}\s*\)(?!,)',
+    re.DOTALL,
+)
+_COMPUTE_COMPILE_OPTIONS_RE = re.compile(
+    r'(wgpu::ComputePipelineDescriptor\s*\{[^}]*)(compile_options:[^,\n]+,)\s*\n(\s*)\}'
+)
+_COMPUTE_MODULE_RE = re.compile(
+    r'(wgpu::ComputePipelineDescriptor\s*\{[^}]*module:[^,\n]+,)\s*\n(\s*)\}'
+)
 
-def fix_texture_view_descriptor(content):
-    """Add usage field to TextureViewDescriptor."""
-    # Match TextureViewDescriptor { \n spaces label:
-    # Insert usage: None, between { and label
-    return re.sub(
-        r'(wgpu::TextureViewDescriptor\s*\{\s*\n)(\s+)(label:)',
-        r'\1\2usage: None,\n\2\3',
-        content
-    )
+# Literal substrings that at least one of the patterns above requires.
+# Files containing none of them cannot change, so they are never decoded.
+_TRIGGER_TOKENS = (
+    b'entry_point:',
+    b'TextureViewDescriptor',
+    b'memory_hints:',
+    b'required_limits:',
+    b'.request_adapter(',
+    b'multiview:',
+    b'fragment:',
+    b'ComputePipelineDescriptor',
+    b'wgpu::Maintain::',
+)
+
+def _simple_fix(m):
+    kind = m.lastgroup
+    if kind == 'entry_point':
+        # entry_point: "string" -> entry_point: Some("string")
+        return f'entry_point: Some("{m.group("ep_name")}")'
+    if kind == 'texture_view':
+        # Insert usage: None, between { and label
+        indent = m.group('tvd_indent')
+        return f'{m.group("tvd_head")}{indent}usage: None,\n{indent}label:'
+    if kind == 'memory_hints':
+        # DeviceDescriptor: add trace: None, after memory_hints
+        return m.group(0) + '\n                trace: None,'
+    if kind == 'request_adapter':
+        # request_adapter().await.ok_or_else(...)? -> request_adapter().await?
+        return m.group('ra_call') + '.await?'
+    # wgpu::Maintain -> wgpu::MaintainBase
+    return 'wgpu::MaintainBase::'
+
+def fix_simple_patterns(content):
+    """Apply the entry_point, TextureViewDescriptor usage, DeviceDescriptor trace,
+    request_adapter and Maintain fixes in a single pass."""
+    return _SIMPLE_FIXES_RE.sub(_simple_fix, content)
 
 def fix_device_descriptor(content):
-    """Add trace field to DeviceDescriptor."""
-    # Find memory_hints line and add trace: None, after it
-    content = re.sub(
-        r'(memory_hints:\s*wgpu::MemoryHints::default\(\),)',
-        r'\1\n                trace: None,',
-        content
-    )
-    
-    # Also handle cases where DeviceDescriptor is missing both fields
+    """Add memory_hints and trace fields to DeviceDescriptor."""
+    # Handle cases where DeviceDescriptor is missing both fields
     # Look for required_limits: ... }, and add memory_hints + trace before the closing brace
-    content = re.sub(
-        r'(required_limits:\s*wgpu::Limits::[^,]+,)\s*\n(\s*)\}',
+    return _REQUIRED_LIMITS_RE.sub(
         r'\1\n\2    memory_hints: wgpu::MemoryHints::default(),\n\2    trace: None,\n\2}',
         content
     )
-    
-    return content
-
-def fix_request_adapter(content):
-    """Remove ok_or_else from request_adapter (now returns Result)."""
-    # request_adapter().await.ok_or_else(...) -> request_adapter().await?
-    return re.sub(
-        r'(\.request_adapter\([^)]+\))\s*\.await\s*\.ok_or_else\([^)]+\)\?',
-        r'\1.await?',
-        content
-    )
 
 def fix_render_pipeline_descriptor(content):
     """Add cache: None to RenderPipelineDescriptor."""
     # Find RenderPipelineDescriptor { ... multiview: ... } and add cache before closing
     # Look for multiview field (last field in most cases)
-    content = re.sub(
-        r'(multiview:\s*[^,\n]+,)\s*\n(\s*)\}',
-        r'\1\n\2    cache: None,\n\2}',
-        content
-    )
+    content = _MULTIVIEW_RE.sub(r'\1\n\2    cache: None,\n\2}', content)
     
     # Also handle cases where fragment is the last field
-    content = re.sub(
-        r'(?s)(fragment:\s*Some\(\s*[^\{]+\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}\s*\),)\s*\n(\s*)\}\s*\)(?!,)',
-        r'\1\n\2    cache: None,\n\2})',
-        content
-    )
+    content = _FRAGMENT_LAST_RE.sub(r'\1\n\2    cache: None,\n\2})', content)
     
     return content
 
 def fix_compute_pipeline_descriptor(content):
     """Add cache: None to ComputePipelineDescriptor."""
     # Find ComputePipelineDescriptor { ... and add cache before closing }
-    content = re.sub(
-        r'(wgpu::ComputePipelineDescriptor\s*\{[^}]*)(compile_options:[^,\n]+,)\s*\n(\s*)\}',
-        r'\1\2\n\3    cache: None,\n\3}',
-        content
-    )
+    content = _COMPUTE_COMPILE_OPTIONS_RE.sub(r'\1\2\n\3    cache: None,\n\3}', content)
     
     # Handle cases where compilation_options or entry_point is last
-    content = re.sub(
-        r'(wgpu::ComputePipelineDescriptor\s*\{[^}]*module:[^,\n]+,)\s*\n(\s*)\}',
-        r'\1\n\2    cache: None,\n\2}',
-        content
-    )
+    content = _COMPUTE_MODULE_RE.sub(r'\1\n\2    cache: None,\n\2}', content)
     
     return content
 
-def fix_wgpu_maintain(content):
-    """Replace wgpu::Maintain with wgpu::MaintainBase."""
-    return re.sub(
-        r'wgpu::Maintain::',
-        r'wgpu::MaintainBase::',
-        content
-    )
+def may_need_fixes(filepath):
+    """Cheap byte-level scan for any trigger token, without decoding the file."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return any(mm.find(token) != -1 for token in _TRIGGER_TOKENS)
 
 def process_file(filepath):
     """Apply all fixes to a single file."""
     try:
+        if not may_need_fixes(filepath):
+            return False
+
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
         original = content
-        content = fix_entry_point(content)
-        content = fix_texture_view_descriptor(content)
+        content = fix_simple_patterns(content)
         content = fix_device_descriptor(content)
-        content = fix_request_adapter(content)
         content = fix_render_pipeline_descriptor(content)
         content = fix_compute_pipeline_descriptor(content)
-        content = fix_wgpu_maintain(content)
         
         if content != original:
             with open(filepath, 'w', encoding='utf-8', newline='\n') as f:
@@ -127,10 +134,9 @@ def main():
     root = Path(".")
     rust_files = list(root.rglob("*.rs"))
     
-    fixed_count = 0
-    for filepath in rust_files:
-        if process_file(filepath):
-            fixed_count += 1
+    # Files are independent, so spread the read/regex/write work across cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        fixed_count = sum(ex.map(process_file, rust_files, chunksize=32))
     
     print(f"\nProcessed {len(rust_files)} files, fixed {fixed_count} files")
 
@@ -17,6 +17,13 @@ import seaborn as sns
 from datetime import datetime
 
 def read_jsonl(path):
+    # Fast path: pandas' C JSON reader builds the frame column-wise in one pass
+    try:
+        return pd.read_json(path, lines=True, convert_dates=['timestamp'])
+    except ValueError:
+        pass
+
+    # Slow path: tolerate blank or malformed lines by parsing one at a time
     records = []
     with open(path, 'r', encoding='utf-8') as f:
         for line in f:
@@ -33,18 +40,33 @@ def read_jsonl(path):
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
+def latest_per_benchmark(df):
+    """Return the most recent row for each benchmark."""
+    # Stable sort keeps append order for equal timestamps; no groupby needed
+    return df.sort_values('timestamp', kind='stable').drop_duplicates('benchmark_name', keep='last')
+
+def display_names(df_sorted):
+    """Map benchmark_name to its first display_name, falling back to the name."""
+    if 'display_name' not in df_sorted.columns:
+        return {name: name for name in df_sorted['benchmark_name'].unique()}
+    first = df_sorted.drop_duplicates('benchmark_name').set_index('benchmark_name')['display_name']
+    return {name: name if pd.isna(display) else display for name, display in first.items()}
+
 def plot_top_series(df, out_dir, top_n=8):
     # Extract latest per benchmark
-    latest = df.sort_values('timestamp').groupby('benchmark_name').last().reset_index()
+    latest = latest_per_benchmark(df)
     top = latest.sort_values('value', ascending=False).head(top_n)
     top_names = top['benchmark_name'].tolist()
 
+    # One sort + groupby pass serves every series lookup below
+    df_sorted = df.sort_values('timestamp', kind='stable')
+    groups = df_sorted.groupby('benchmark_name', sort=False)
+    display_map = display_names(df_sorted)
+
     plt.figure(figsize=(12, 6))
     for name in top_names:
-        s = df[df['benchmark_name'] == name].sort_values('timestamp')
-        # Use display_name if available, otherwise benchmark_name
-        display_name = s['display_name'].iloc[0] if 'display_name' in s.columns and not pd.isna(s['display_name'].iloc[0]) else name
-        plt.plot(pd.to_datetime(s['timestamp']), s['value'], label=display_name)
+        s = groups.get_group(name)
+        plt.plot(pd.to_datetime(s['timestamp']), s['value'], label=display_map[name])
 
     plt.legend()
     plt.title('Top Benchmarks Time Series')
@@ -55,7 +77,7 @@ def plot_top_series(df, out_dir, top_n=8):
     plt.close()
 
 def plot_distribution(df, out_dir):
-    latest = df.sort_values('timestamp').groupby('benchmark_name').last().reset_index()
+    latest = latest_per_benchmark(df)
     plt.figure(figsize=(10, 4))
     sns.histplot(latest['value'], bins=40, kde=True, color='#4facfe')
     plt.title('Latest Snapshot Distribution of Values')
@@ -69,15 +91,7 @@ def plot_heatmap(df, out_dir, max_benchmarks=30, max_columns=48):
     df_sorted = df.sort_values('timestamp')
     
     # Create display name mapping
-    display_map = {}
-    if 'display_name' in df_sorted.columns:
-        # Group by benchmark_name and get first row for each group
-        for bench_name, group in df_sorted.groupby('benchmark_name'):
-            first_row = group.iloc[0]
-            display_name = first_row.get('display_name', bench_name)
-            display_map[bench_name] = display_name if not pd.isna(display_name) else bench_name
-    else:
-        display_map = {name: name for name in df_sorted['benchmark_name'].unique()}
+    display_map = display_names(df_sorted)
     
     # Pivot to have timestamps as columns, values as cells
     pivot = df_sorted.pivot_table(index='benchmark_name', columns='timestamp', values='value')
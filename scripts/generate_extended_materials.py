@@ -18,8 +18,9 @@ Each material gets: albedo.png, normal.png (procedural), mra.png
 
 import os
 import sys
-import random
-import math
+import functools
+import zlib
+from multiprocessing import Pool
 from pathlib import Path
 
 try:
@@ -28,46 +29,98 @@ except ImportError:
     print("ERROR: Pillow not installed. Run: pip install Pillow")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+# Lattice interpolation for every octave runs through _interp_numba when
+# numba is installed, and through _interp_numpy otherwise
+from _numba_pool import init_pool_worker, njit, prange
+
 RESOLUTION = 1024
 
-def clamp(val, lo=0.0, hi=1.0):
-    return max(lo, min(hi, val))
+# Noise arrays and texture math are float32 throughout: lattices are drawn
+# as float32, the cached weights cast their int cell index before use, and
+# Python-scalar arithmetic keeps the array dtype. Outputs are quantized to
+# 8 bits, so float64 would only double memory traffic.
+
+@functools.lru_cache(maxsize=32)
+def _lattice_weights(n, scale, last_cell):
+    """Lattice cell index and smoothstep weight for each of n pixels along an axis."""
+    pos = np.arange(n, dtype=np.float32) / np.float32(scale)
+    idx = np.minimum(pos.astype(int), last_cell)
+    f = pos - idx.astype(np.float32)
+    f = f * f * (3 - 2 * f)
+    idx.flags.writeable = False
+    f.flags.writeable = False
+    return idx, f
+
+def _interp_numpy(grid, w, h, scale):
+    gh, gw = grid.shape
+    # Every noise field and octave at this size/scale shares the same weights
+    ix, fx = _lattice_weights(w, scale, gw - 2)
+    iy, fy = _lattice_weights(h, scale, gh - 2)
+    fx = fx[None, :]
+    fy = fy[:, None]
+    r0, r1 = iy[:, None], iy[:, None] + 1
+    c0, c1 = ix[None, :], ix[None, :] + 1
+    return (grid[r0, c0] * (1 - fx) + grid[r0, c1] * fx) * (1 - fy) + \
+           (grid[r1, c0] * (1 - fx) + grid[r1, c1] * fx) * fy
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _interp_numba(grid, w, h, scale):
+        gh, gw = grid.shape
+        out = np.empty((h, w), dtype=np.float32)
+        for y in prange(h):
+            gy = y / scale
+            iy = min(int(gy), gh - 2)
+            fy = gy - iy; fy = fy * fy * (3 - 2 * fy)
+            for x in range(w):
+                gx = x / scale
+                ix = min(int(gx), gw - 2)
+                fx = gx - ix; fx = fx * fx * (3 - 2 * fx)
+                out[y, x] = (grid[iy, ix] * (1 - fx) + grid[iy, ix + 1] * fx) * (1 - fy) + \
+                            (grid[iy + 1, ix] * (1 - fx) + grid[iy + 1, ix + 1] * fx) * fy
+        return out
+
+def _interpolate(grid, w, h, scale):
+    if njit is not None:
+        return _interp_numba(grid, w, h, float(scale))
+    return _interp_numpy(grid, w, h, scale)
 
 def noise_layer(w, h, scale=64.0, seed=42):
-    random.seed(seed)
     gw = int(w / scale) + 2
     gh = int(h / scale) + 2
-    grid = [[random.random() for _ in range(gw)] for _ in range(gh)]
-    out = []
-    for y in range(h):
-        row = []
-        for x in range(w):
-            gx, gy = x / scale, y / scale
-            ix, iy = min(int(gx), gw - 2), min(int(gy), gh - 2)
-            fx = (gx - ix); fx = fx * fx * (3 - 2 * fx)
-            fy = (gy - iy); fy = fy * fy * (3 - 2 * fy)
-            v = (grid[iy][ix] * (1 - fx) + grid[iy][ix + 1] * fx) * (1 - fy) + \
-                (grid[iy + 1][ix] * (1 - fx) + grid[iy + 1][ix + 1] * fx) * fy
-            row.append(v)
-        out.append(row)
-    return out
+    grid = np.random.default_rng(seed).random((gh, gw), dtype=np.float32)
+    return _interpolate(grid, w, h, scale)
 
+@functools.lru_cache(maxsize=64)
 def multi_octave_noise(w, h, octaves=4, seed=42):
-    result = [[0.0] * w for _ in range(h)]
-    amp = 1.0
-    freq = 1.0
-    total_amp = 0.0
-    for o in range(octaves):
-        n = noise_layer(w, h, scale=max(8, 128 / freq), seed=seed + o * 1000)
-        for y in range(h):
-            for x in range(w):
-                result[y][x] += n[y][x] * amp
-        total_amp += amp
-        amp *= 0.5
-        freq *= 2.0
-    for y in range(h):
-        for x in range(w):
-            result[y][x] /= total_amp
+    # Cached by (w, h, octaves, seed); the result is shared, so keep it read-only
+    scales = [max(8, 128 / 2 ** o) for o in range(octaves)]
+    # Draw one lattice at the finest octave's spacing; coarser octaves
+    # sample every k-th cell of it instead of seeding their own grid. The
+    # k // 2 offset keeps octaves from sharing values at lattice points.
+    finest = min(scales)
+    strides = [int(round(scale / finest)) for scale in scales]
+    gw = max(k // 2 + (int(w / scale) + 1) * k + 1 for scale, k in zip(scales, strides))
+    gh = max(k // 2 + (int(h / scale) + 1) * k + 1 for scale, k in zip(scales, strides))
+    base = np.random.default_rng(seed).random((gh, gw), dtype=np.float32)
+
+    # Amplitudes halve per octave; fold the final normalization into each
+    # octave's weight and scale layers in place, so accumulating needs no
+    # temporaries and no separate divide pass over the result.
+    amps = [0.5 ** o for o in range(octaves)]
+    total_amp = sum(amps)
+    result = np.zeros((h, w), dtype=np.float32)
+    for scale, k, amp in zip(scales, strides, amps):
+        layer = _interpolate(base[k // 2::k, k // 2::k], w, h, scale)
+        layer *= np.float32(amp / total_amp)
+        result += layer
+    result.flags.writeable = False
     return result
 
 EXTENDED_MATERIALS = {
@@ -148,62 +201,50 @@ EXTENDED_MATERIALS = {
 
 def generate_texture_set(name, preset, out_dir):
     """Generate albedo, normal, and MRA textures for a material."""
-    seed_base = hash(name) & 0xFFFF
+    # crc32 rather than hash(): str hashes are randomized per process
+    seed_base = zlib.crc32(name.encode("utf-8")) & 0xFFFF
     noise1 = multi_octave_noise(RESOLUTION, RESOLUTION, octaves=4, seed=seed_base)
     noise2 = multi_octave_noise(RESOLUTION, RESOLUTION, octaves=4, seed=seed_base + 100)
     noise3 = multi_octave_noise(RESOLUTION, RESOLUTION, octaves=3, seed=seed_base + 200)
     
     # --- Albedo ---
-    albedo = Image.new("RGBA", (RESOLUTION, RESOLUTION))
-    pix = albedo.load()
     c = preset["color"]
     v = preset["color_var"]
-    for y in range(RESOLUTION):
-        for x in range(RESOLUTION):
-            n = (noise1[y][x] - 0.5) * 2.0 * v
-            r = int(clamp(c[0] + n, 0, 255))
-            g = int(clamp(c[1] + n * 0.9, 0, 255))
-            b = int(clamp(c[2] + n * 0.8, 0, 255))
-            pix[x, y] = (r, g, b, 255)
-    albedo.save(str(out_dir / f"{name}.png"), "PNG", optimize=True)
+    n = (noise1 - 0.5) * 2.0 * v
+    opaque = np.full((RESOLUTION, RESOLUTION), 255, dtype=np.uint8)
+    r = np.clip(c[0] + n, 0, 255).astype(np.uint8)
+    g = np.clip(c[1] + n * 0.9, 0, 255).astype(np.uint8)
+    b = np.clip(c[2] + n * 0.8, 0, 255).astype(np.uint8)
+    albedo = Image.fromarray(np.dstack([r, g, b, opaque]), "RGBA")
+    albedo.save(str(out_dir / f"{name}.png"), "PNG", compress_level=6)
 
     # --- Normal map (from height derivative) ---
-    normal = Image.new("RGBA", (RESOLUTION, RESOLUTION))
-    pix = normal.load()
     strength = 2.0
-    for y in range(RESOLUTION):
-        for x in range(RESOLUTION):
-            # Sobel-like derivative from noise
-            x0 = noise1[y][(x - 1) % RESOLUTION]
-            x1 = noise1[y][(x + 1) % RESOLUTION]
-            y0 = noise1[(y - 1) % RESOLUTION][x]
-            y1 = noise1[(y + 1) % RESOLUTION][x]
-            dx = (x1 - x0) * strength
-            dy = (y1 - y0) * strength
-            # Normal = normalize(-dx, -dy, 1)
-            mag = math.sqrt(dx * dx + dy * dy + 1.0)
-            nx = (-dx / mag) * 0.5 + 0.5
-            ny = (-dy / mag) * 0.5 + 0.5
-            nz = (1.0 / mag) * 0.5 + 0.5
-            pix[x, y] = (int(nx * 255), int(ny * 255), int(nz * 255), 255)
-    normal.save(str(out_dir / f"{name}_n.png"), "PNG", optimize=True)
+    # Sobel-like derivative from noise (wraps at the edges)
+    dx = (np.roll(noise1, -1, axis=1) - np.roll(noise1, 1, axis=1)) * strength
+    dy = (np.roll(noise1, -1, axis=0) - np.roll(noise1, 1, axis=0)) * strength
+    # Normal = normalize(-dx, -dy, 1)
+    mag = np.sqrt(dx * dx + dy * dy + 1.0)
+    nx = (-dx / mag) * 0.5 + 0.5
+    ny = (-dy / mag) * 0.5 + 0.5
+    nz = (1.0 / mag) * 0.5 + 0.5
+    rgb = (np.dstack([nx, ny, nz]) * 255).astype(np.uint8)
+    normal = Image.fromarray(np.dstack([rgb, opaque]), "RGBA")
+    normal.save(str(out_dir / f"{name}_n.png"), "PNG", compress_level=6)
 
     # --- MRA (Metallic, Roughness, AO) ---
-    mra = Image.new("RGBA", (RESOLUTION, RESOLUTION))
-    pix = mra.load()
     m_base = preset["metallic"]
     r_base = preset["roughness"]
     ao_base = preset["ao_base"]
     var = preset["variation"]
-    for y in range(RESOLUTION):
-        for x in range(RESOLUTION):
-            n = (noise2[y][x] - 0.5) * 2.0
-            n2 = (noise3[y][x] - 0.5) * 2.0
-            m = clamp(m_base + n * var * 0.2)
-            r = clamp(r_base + n * var)
-            ao = clamp(ao_base + n2 * var * 1.2)
-            pix[x, y] = (int(m * 255), int(r * 255), int(ao * 255), 255)
-    mra.save(str(out_dir / f"{name}_mra.png"), "PNG", optimize=True)
+    n = (noise2 - 0.5) * 2.0
+    n2 = (noise3 - 0.5) * 2.0
+    m = np.clip(m_base + n * var * 0.2, 0.0, 1.0)
+    r = np.clip(r_base + n * var, 0.0, 1.0)
+    ao = np.clip(ao_base + n2 * var * 1.2, 0.0, 1.0)
+    rgb = (np.dstack([m, r, ao]) * 255).astype(np.uint8)
+    mra = Image.fromarray(np.dstack([rgb, opaque]), "RGBA")
+    mra.save(str(out_dir / f"{name}_mra.png"), "PNG", compress_level=6)
 
 
 def main():
@@ -217,15 +258,19 @@ def main():
     print(f"Materials: {len(EXTENDED_MATERIALS)}")
     print()
 
-    for name, preset in EXTENDED_MATERIALS.items():
-        print(f"  Generating {name} set (albedo + normal + MRA)...", flush=True)
-        generate_texture_set(name, preset, materials_dir)
+    # Materials are independent; generate them in parallel, one thread each
+    print(f"  Generating {len(EXTENDED_MATERIALS)} sets (albedo + normal + MRA)...", flush=True)
+    jobs = [(name, preset, materials_dir) for name, preset in EXTENDED_MATERIALS.items()]
+    with Pool(initializer=init_pool_worker) as pool:
+        pool.starmap(generate_texture_set, jobs)
+
+    for name in EXTENDED_MATERIALS:
         # Report sizes
         sizes = []
         for suffix in ["", "_n", "_mra"]:
             p = materials_dir / f"{name}{suffix}.png"
             sizes.append(f"{p.stat().st_size // 1024}KB")
-        print(f"    → {', '.join(sizes)}")
+        print(f"    {name} → {', '.join(sizes)}")
 
     print()
     print(f"Generated {len(EXTENDED_MATERIALS) * 3} texture files")
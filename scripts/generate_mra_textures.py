@@ -15,8 +15,14 @@ Each material gets physically-accurate PBR values based on real-world measuremen
 
 import os
 import sys
-import random
+import argparse
 import math
+import functools
+import hashlib
+import io
+import json
+import zlib
+from multiprocessing import Pool
 from pathlib import Path
 
 try:
@@ -25,9 +31,39 @@ except ImportError:
     print("ERROR: Pillow not installed. Run: pip install Pillow")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+# With numba installed, metallic/roughness/AO are computed per pixel in a
+# compiled kernel instead of as whole-array NumPy expressions
+from _numba_pool import init_pool_worker, njit, prange
+
 # Texture resolution - matches engine's internal 1024x1024 pipeline
 RESOLUTION = 1024
 
+# MRA noise is evaluated at RESOLUTION / NOISE_DOWNSAMPLE and Lanczos-upscaled.
+# The coarsest lattice cell still spans many pixels, so no detail is lost.
+NOISE_DOWNSAMPLE = 4
+
+# Records the inputs each MRA texture was generated from, and the content
+# hash of any default albedo/flat normal written, so unchanged outputs are
+# skipped on the next run. Delete it to force regeneration.
+MANIFEST_NAME = "mra_manifest.json"
+
+# Bump when the noise/texture algorithm changes so manifest entries written
+# by an older generator no longer match.
+GENERATOR_VERSION = 3
+
+# PNG encoder settings. "fast" is for dev iterations: same pixels, much quicker
+# zlib pass, somewhat larger files. "release" is the exhaustive optimizer.
+PNG_OPTIONS = {
+    "fast": {"compress_level": 1},
+    "release": {"optimize": True, "compress_level": 9},
+}
+
 # ============================================================================
 # Physically-based material definitions
 # ============================================================================
@@ -140,50 +176,166 @@ MATERIAL_PRESETS = {
 }
 
 
-def clamp(val: float, lo: float = 0.0, hi: float = 1.0) -> float:
-    return max(lo, min(hi, val))
+def material_seed(name: str) -> int:
+    """Stable per-material noise seed (hash() is randomized per process)."""
+    return zlib.crc32(name.encode("utf-8")) & 0xFFFF
 
 
-def generate_perlin_noise(width: int, height: int, scale: float = 64.0, seed: int = 42) -> list:
-    """Generate simple value noise for natural-looking variation."""
-    random.seed(seed)
+def preset_hash(preset: dict) -> str:
+    """Digest of everything that determines a material's MRA output."""
+    key = json.dumps(
+        {"preset": preset, "resolution": RESOLUTION, "generator": GENERATOR_VERSION}, sort_keys=True
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _lattice(grid_w: int, grid_h: int, seed: int) -> np.ndarray:
+    """Grid of random lattice values for value noise (cached, read-only)."""
+    grid = np.random.default_rng(seed).random((grid_h, grid_w), dtype=np.float32)
+    grid.flags.writeable = False
+    return grid
 
-    # Create grid of random values
-    grid_w = int(width / scale) + 2
-    grid_h = int(height / scale) + 2
-    grid = [[random.random() for _ in range(grid_w)] for _ in range(grid_h)]
 
-    noise = []
-    for y in range(height):
-        row = []
-        for x in range(width):
-            # Bilinear interpolation
-            gx = x / scale
-            gy = y / scale
-            ix = int(gx)
-            iy = int(gy)
-            fx = gx - ix
-            fy = gy - iy
+@functools.lru_cache(maxsize=32)
+def _coords(width: int, height: int, scale: float) -> tuple:
+    """Lattice indices and smootherstep weights for every pixel at `scale`.
 
-            # Smoothstep for smoother interpolation
-            fx = fx * fx * (3.0 - 2.0 * fx)
-            fy = fy * fy * (3.0 - 2.0 * fy)
+    Depends only on (width, height, scale), so it is computed once and shared
+    by every lattice (seed, material) sampled at that size. Indices are
+    clamped to the standard int(n / scale) + 2 lattice; larger lattices
+    just leave their extra cells unused. Returned arrays are read-only and
+    shaped to broadcast: ix/fx are (1, W), iy/fy are (H, 1).
+    """
+    gx = np.arange(width, dtype=np.float32) / np.float32(scale)
+    gy = np.arange(height, dtype=np.float32) / np.float32(scale)
+    fx = gx - np.floor(gx)
+    fy = gy - np.floor(gy)
+    ix = np.minimum(gx.astype(np.intp), int(width / scale))
+    iy = np.minimum(gy.astype(np.intp), int(height / scale))
 
-            ix = min(ix, grid_w - 2)
-            iy = min(iy, grid_h - 2)
+    # Quintic smootherstep (6t^5 - 15t^4 + 10t^3): C2-continuous, so no
+    # separate high-frequency layer is needed to hide lattice creases
+    fx = fx * fx * fx * (fx * (fx * 6.0 - 15.0) + 10.0)
+    fy = fy * fy * fy * (fy * (fy * 6.0 - 15.0) + 10.0)
 
-            v00 = grid[iy][ix]
-            v10 = grid[iy][ix + 1]
-            v01 = grid[iy + 1][ix]
-            v11 = grid[iy + 1][ix + 1]
+    coords = (ix[None, :], iy[:, None], fx[None, :], fy[:, None])
+    for arr in coords:
+        arr.flags.writeable = False
+    return coords
 
-            v0 = v00 + (v10 - v00) * fx
-            v1 = v01 + (v11 - v01) * fx
-            val = v0 + (v1 - v0) * fy
 
-            row.append(val)
-        noise.append(row)
-    return noise
+def _interp(grid: np.ndarray, ix: np.ndarray, iy: np.ndarray, fx: np.ndarray, fy: np.ndarray) -> np.ndarray:
+    """Smootherstep-bilinear interpolation of a lattice at precomputed coordinates."""
+    v00 = grid[iy, ix]
+    v10 = grid[iy, ix + 1]
+    v01 = grid[iy + 1, ix]
+    v11 = grid[iy + 1, ix + 1]
+
+    v0 = v00 + (v10 - v00) * fx
+    v1 = v01 + (v11 - v01) * fx
+    return v0 + (v1 - v0) * fy
+
+
+def generate_perlin_noise(width: int, height: int, scale: float = 64.0, seed: int = 42) -> np.ndarray:
+    """Generate simple value noise for natural-looking variation."""
+    # Create grid of random values
+    grid_w = int(width / scale) + 2
+    grid_h = int(height / scale) + 2
+    return _interp(_lattice(grid_w, grid_h, seed), *_coords(width, height, scale))
+
+
+def generate_octave_noise(width: int, height: int, scales: tuple, seed: int = 42) -> list:
+    """Generate one value-noise octave per scale from a shared lattice.
+
+    The MRA pass uses two octaves (low and mid frequency). The lattice is
+    drawn at the mid octave's spacing and the low octave reads every k-th
+    cell (k = scale / finest, rounded), starting k // 2 cells in so the two
+    octaves don't take the same value at the image origin.
+    """
+    finest = min(scales)
+    strides = [int(round(scale / finest)) for scale in scales]
+    grid_w = max(k // 2 + (int(width / scale) + 1) * k + 1 for scale, k in zip(scales, strides))
+    grid_h = max(k // 2 + (int(height / scale) + 1) * k + 1 for scale, k in zip(scales, strides))
+    base = _lattice(grid_w, grid_h, seed)
+    return [
+        _interp(base[k // 2::k, k // 2::k], *_coords(width, height, scale))
+        for scale, k in zip(scales, strides)
+    ]
+
+
+def _mra_pixels_numpy(noise_low, noise_med, metallic_val, roughness_val, ao_base, variation):
+    """Metallic/roughness/AO channels as a (H, W, 4) uint8 array."""
+    # Combine noise at multiple frequencies
+    n = (noise_low * 0.65 + noise_med * 0.35)
+    n = (n - 0.5) * 2.0  # Normalize to [-1, 1]
+
+    # Metallic: almost always 0 for dielectric materials
+    m = np.clip(metallic_val + n * variation * 0.1, 0.0, 1.0)
+
+    # Roughness: varies naturally based on noise
+    r = np.clip(roughness_val + n * variation, 0.0, 1.0)
+
+    # AO: noise creates subtle depth variation, with more in crevices
+    ao_noise = (noise_med - 0.5) * variation * 1.5
+    ao = np.clip(ao_base + ao_noise, 0.0, 1.0)
+
+    # Each channel was computed as its own contiguous (H, W) plane; interleave
+    # them into a single uint8 allocation (assignment truncates like int())
+    rgba = np.empty(noise_low.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = m * 255
+    rgba[..., 1] = r * 255
+    rgba[..., 2] = ao * 255
+    rgba[..., 3] = 255
+    return rgba
+
+
+if njit is not None:
+    # Mirrors _mra_pixels_numpy operation for operation in float32 (NumPy
+    # rounds the Python-float presets to the array dtype), so both backends
+    # write identical bytes. No fastmath: reassociation or FMA contraction
+    # would change the rounding.
+    @njit(parallel=True, cache=True)
+    def _mra_pixels_numba(noise_low, noise_med, metallic_val, roughness_val, ao_base, variation):
+        h, w = noise_low.shape
+        f32 = np.float32
+        metallic_val = f32(metallic_val)
+        roughness_val = f32(roughness_val)
+        ao_base = f32(ao_base)
+        variation = f32(variation)
+        zero = f32(0.0)
+        one = f32(1.0)
+        out = np.empty((h, w, 4), dtype=np.uint8)
+        for y in prange(h):
+            for x in range(w):
+                n = noise_low[y, x] * f32(0.65) + noise_med[y, x] * f32(0.35)
+                n = (n - f32(0.5)) * f32(2.0)
+                m = min(max(metallic_val + n * variation * f32(0.1), zero), one)
+                r = min(max(roughness_val + n * variation, zero), one)
+                ao_noise = (noise_med[y, x] - f32(0.5)) * variation * f32(1.5)
+                ao = min(max(ao_base + ao_noise, zero), one)
+                out[y, x, 0] = np.uint8(m * f32(255))
+                out[y, x, 1] = np.uint8(r * f32(255))
+                out[y, x, 2] = np.uint8(ao * f32(255))
+                out[y, x, 3] = 255
+        return out
+
+
+def check_numba_parity(resolution: int = 256) -> bool:
+    """Run both pixel backends on one preset and report whether they agree.
+
+    Outputs are cached by preset hash, so a Numba build that rounds
+    differently would leave textures that depend on which machine made them.
+    """
+    name, preset = next(iter(MATERIAL_PRESETS.items()))
+    size = max(1, resolution // NOISE_DOWNSAMPLE)
+    noise_low, noise_med = generate_octave_noise(
+        size, size, scales=(128.0 / NOISE_DOWNSAMPLE, 48.0 / NOISE_DOWNSAMPLE),
+        seed=material_seed(name),
+    )
+    args = (noise_low, noise_med, preset["metallic"], preset["roughness"],
+            preset["ao_base"], preset["variation"])
+    return np.array_equal(_mra_pixels_numba(*args), _mra_pixels_numpy(*args))
 
 
 def generate_mra_texture(
@@ -198,44 +350,51 @@ def generate_mra_texture(
     ao_base = preset["ao_base"]
     variation = preset["variation"]
 
-    # Generate noise layers at different frequencies for natural look
-    noise_low = generate_perlin_noise(resolution, resolution, scale=128.0, seed=hash(material_name) & 0xFFFF)
-    noise_med = generate_perlin_noise(resolution, resolution, scale=48.0, seed=(hash(material_name) + 1) & 0xFFFF)
-    noise_hi = generate_perlin_noise(resolution, resolution, scale=16.0, seed=(hash(material_name) + 2) & 0xFFFF)
+    # Generate noise layers at different frequencies for natural look,
+    # at reduced resolution (scales shrink with it) and upscaled at the end
+    size = max(1, resolution // NOISE_DOWNSAMPLE)
+    noise_low, noise_med = generate_octave_noise(
+        size, size, scales=(128.0 / NOISE_DOWNSAMPLE, 48.0 / NOISE_DOWNSAMPLE),
+        seed=material_seed(material_name),
+    )
+
+    if njit is not None:
+        rgba = _mra_pixels_numba(noise_low, noise_med, metallic_val, roughness_val, ao_base, variation)
+    else:
+        rgba = _mra_pixels_numpy(noise_low, noise_med, metallic_val, roughness_val, ao_base, variation)
+    img = Image.fromarray(rgba, "RGBA")
+    if size != resolution:
+        img = img.resize((resolution, resolution), Image.Resampling.LANCZOS)
+    return img
 
-    img = Image.new("RGBA", (resolution, resolution))
-    pixels = img.load()
 
-    for y in range(resolution):
-        for x in range(resolution):
-            # Combine noise at multiple frequencies
-            n = (noise_low[y][x] * 0.5 + noise_med[y][x] * 0.35 + noise_hi[y][x] * 0.15)
-            n = (n - 0.5) * 2.0  # Normalize to [-1, 1]
+_FLAT_NORMAL_CACHE = {}
 
-            # Metallic: almost always 0 for dielectric materials
-            m = clamp(metallic_val + n * variation * 0.1)
 
-            # Roughness: varies naturally based on noise
-            r = clamp(roughness_val + n * variation)
+def generate_flat_normal() -> Image.Image:
+    """Generate a proper flat normal map (128, 128, 255) in tangent space.
 
-            # AO: noise creates subtle depth variation, with more in crevices
-            ao_noise = (noise_hi[y][x] - 0.5) * variation * 1.5
-            ao = clamp(ao_base + ao_noise)
+    The image is constant, so it is built once per resolution and reused.
+    """
+    if RESOLUTION not in _FLAT_NORMAL_CACHE:
+        _FLAT_NORMAL_CACHE[RESOLUTION] = Image.new("RGBA", (RESOLUTION, RESOLUTION), (128, 128, 255, 255))
+    return _FLAT_NORMAL_CACHE[RESOLUTION]
 
-            pixels[x, y] = (
-                int(m * 255),
-                int(r * 255),
-                int(ao * 255),
-                255,
-            )
 
-    return img
+_FLAT_NORMAL_PNG_BYTES = {}
 
 
-def generate_flat_normal() -> Image.Image:
-    """Generate a proper flat normal map (128, 128, 255) in tangent space."""
-    img = Image.new("RGBA", (RESOLUTION, RESOLUTION), (128, 128, 255, 255))
-    return img
+def flat_normal_png_bytes(encoding: str = "release") -> bytes:
+    """The flat normal map, PNG-encoded once per (resolution, encoding).
+
+    Every material gets byte-identical normals, so later ones just write these bytes.
+    """
+    key = (RESOLUTION, encoding)
+    if key not in _FLAT_NORMAL_PNG_BYTES:
+        buf = io.BytesIO()
+        generate_flat_normal().save(buf, "PNG", **PNG_OPTIONS[encoding])
+        _FLAT_NORMAL_PNG_BYTES[key] = buf.getvalue()
+    return _FLAT_NORMAL_PNG_BYTES[key]
 
 
 def generate_default_albedo(material_name: str) -> Image.Image:
@@ -260,22 +419,106 @@ def generate_default_albedo(material_name: str) -> Image.Image:
 
     base_color = color_map.get(material_name, (180, 180, 180))
 
-    img = Image.new("RGBA", (RESOLUTION, RESOLUTION))
-    noise = generate_perlin_noise(RESOLUTION, RESOLUTION, scale=64.0, seed=hash(material_name + "_albedo") & 0xFFFF)
-    pixels = img.load()
+    noise = generate_perlin_noise(RESOLUTION, RESOLUTION, scale=64.0, seed=material_seed(material_name + "_albedo"))
 
-    for y in range(RESOLUTION):
-        for x in range(RESOLUTION):
-            n = (noise[y][x] - 0.5) * 30  # Subtle color variation
-            r = int(clamp(base_color[0] + n, 0, 255))
-            g = int(clamp(base_color[1] + n, 0, 255))
-            b = int(clamp(base_color[2] + n, 0, 255))
-            pixels[x, y] = (r, g, b, 255)
+    # Subtle color variation, applied to all three channels at once and
+    # written straight into one preallocated RGBA buffer
+    n = (noise[:, :, None] - 0.5) * 30
+    buf = np.empty((RESOLUTION, RESOLUTION, 4), dtype=np.uint8)
+    buf[..., :3] = np.clip(np.array(base_color, dtype=np.float32)[None, None, :] + n, 0, 255)
+    buf[..., 3] = 255
+    return Image.frombuffer("RGBA", (RESOLUTION, RESOLUTION), buf, "raw", "RGBA", 0, 1)
 
-    return img
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def is_valid_texture(path: Path, generated_sha256: str = None) -> bool:
+    """A texture is valid if we wrote it (content hash matches) or it looks real."""
+    if not path.exists():
+        return False
+    if generated_sha256 and file_sha256(path) == generated_sha256:
+        return True
+    if path.stat().st_size < 500:
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+
+
+def process_material(item, materials_dir: Path, manifest: dict, encoding: str = "release"):
+    """Generate one material's MRA (and any missing albedo/normal).
+
+    Returns (textures written, log lines, manifest entry) so the parent
+    prints in order and owns the manifest file.
+    """
+    material_name, preset = item
+    generated = 0
+    log = []
+
+    mra_path = materials_dir / f"{material_name}_mra.png"
+    old_size = mra_path.stat().st_size if mra_path.exists() else 0
+    inputs = {
+        "seed": material_seed(material_name),
+        "preset_hash": preset_hash(preset),
+        "encoding": encoding,
+    }
+    png_options = PNG_OPTIONS[encoding]
+    cached = manifest.get(material_name, {})
+    entry = dict(cached)
+
+    if (mra_path.exists()
+            and all(cached.get(key) == value for key, value in inputs.items())
+            and cached.get("mtime") == mra_path.stat().st_mtime_ns):
+        log.append(f"  Skipping {material_name}_mra.png (unchanged)")
+    else:
+        # Generate MRA texture
+        log.append(f"  Generating {material_name}_mra.png ... "
+                   f"(M={preset['metallic']:.1f}, R={preset['roughness']:.2f}, AO={preset['ao_base']:.2f})")
+
+        mra_img = generate_mra_texture(material_name, preset)
+        mra_img.save(str(mra_path), "PNG", **png_options)
+
+        new_size = mra_path.stat().st_size
+        entry.update(inputs, mtime=mra_path.stat().st_mtime_ns)
+        generated += 1
+
+        log.append(f"    → {new_size:,} bytes (was {old_size:,} bytes)")
+
+    # Check if albedo exists and is valid
+    albedo_path = materials_dir / f"{material_name}.png"
+    if not is_valid_texture(albedo_path, cached.get("albedo_sha256")):
+        log.append(f"  Generating {material_name}.png (default albedo) ...")
+        albedo_img = generate_default_albedo(material_name)
+        albedo_img.save(str(albedo_path), "PNG", **png_options)
+        entry["albedo_sha256"] = file_sha256(albedo_path)
+        generated += 1
+
+    # Check if normal exists and is valid
+    normal_path = materials_dir / f"{material_name}_n.png"
+    if not is_valid_texture(normal_path, cached.get("normal_sha256")):
+        log.append(f"  Generating {material_name}_n.png (flat normal) ...")
+        normal_png = flat_normal_png_bytes(encoding)
+        normal_path.write_bytes(normal_png)
+        entry["normal_sha256"] = hashlib.sha256(normal_png).hexdigest()
+        generated += 1
+
+    return generated, log, entry
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate MRA textures for all materials")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fast", dest="encoding", action="store_const", const="fast",
+                      help="Quick PNG encode (compress_level=1) for dev iterations")
+    mode.add_argument("--release", dest="encoding", action="store_const", const="release",
+                      help="Fully optimized PNG encode (default)")
+    parser.set_defaults(encoding="release")
+    args = parser.parse_args()
+
     repo_root = Path(__file__).parent.parent
     materials_dir = repo_root / "assets" / "materials"
 
@@ -289,42 +532,37 @@ def main():
     print(f"Resolution: {RESOLUTION}x{RESOLUTION}")
     print(f"Materials dir: {materials_dir}")
     print(f"Materials to process: {len(MATERIAL_PRESETS)}")
+    print(f"PNG encoding: {args.encoding}")
     print()
 
-    generated = 0
-    skipped = 0
-
-    for material_name, preset in MATERIAL_PRESETS.items():
-        mra_path = materials_dir / f"{material_name}_mra.png"
-        old_size = mra_path.stat().st_size if mra_path.exists() else 0
+    manifest_path = materials_dir / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
 
-        # Generate MRA texture
-        print(f"  Generating {material_name}_mra.png ... ", end="", flush=True)
-        print(f"(M={preset['metallic']:.1f}, R={preset['roughness']:.2f}, AO={preset['ao_base']:.2f})")
-
-        mra_img = generate_mra_texture(material_name, preset)
-        mra_img.save(str(mra_path), "PNG", optimize=True)
-
-        new_size = mra_path.stat().st_size
-        generated += 1
+    generated = 0
 
-        print(f"    → {new_size:,} bytes (was {old_size:,} bytes)")
-
-        # Check if albedo exists and is valid
-        albedo_path = materials_dir / f"{material_name}.png"
-        if not albedo_path.exists() or albedo_path.stat().st_size < 500:
-            print(f"  Generating {material_name}.png (default albedo) ...", flush=True)
-            albedo_img = generate_default_albedo(material_name)
-            albedo_img.save(str(albedo_path), "PNG", optimize=True)
-            generated += 1
-
-        # Check if normal exists and is valid
-        normal_path = materials_dir / f"{material_name}_n.png"
-        if not normal_path.exists() or normal_path.stat().st_size < 500:
-            print(f"  Generating {material_name}_n.png (flat normal) ...", flush=True)
-            normal_img = generate_flat_normal()
-            normal_img.save(str(normal_path), "PNG", optimize=True)
-            generated += 1
+    # Materials are independent; generate them in parallel and print each
+    # worker's log in preset order once it finishes
+    worker = functools.partial(
+        process_material, materials_dir=materials_dir, manifest=manifest, encoding=args.encoding
+    )
+    with Pool(initializer=init_pool_worker) as pool:
+        # Checked in a worker: starting Numba's thread pool in the parent
+        # before the fork can deadlock the children
+        if njit is not None and not pool.apply(check_numba_parity):
+            print("ERROR: Numba MRA kernel output differs from the NumPy path; "
+                  "uninstall numba or fix _mra_pixels_numba")
+            sys.exit(1)
+        for (material_name, _), (count, log, entry) in zip(
+            MATERIAL_PRESETS.items(), pool.imap(worker, MATERIAL_PRESETS.items())
+        ):
+            print("\n".join(log), flush=True)
+            generated += count
+            manifest[material_name] = entry
+
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
 
     print()
     print("=" * 60)
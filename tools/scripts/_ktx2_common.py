@@ -0,0 +1,86 @@
+"""
+Shared helpers for the AWTEX2 → KTX2 migration and validation scripts.
+"""
+
+import json
+import os
+from functools import partial
+from pathlib import Path
+
+# orjson is optional; stdlib json.loads accepts the same bytes
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# AWTEX2 magic: "AW_TEX2\0" or "AWTEX2\0\0"
+AWTEX2_MAGIC = b"AW_TEX2\0"
+AWTEX2_MAGIC_ALT = b"AWTEX2\0\0"
+# KTX2 magic: 0xAB 0x4B 0x54 0x58 0x20 0x32 0x30 0xBB 0x0D 0x0A 0x1A 0x0A
+KTX2_MAGIC = b"\xAB\x4B\x54\x58\x20\x32\x30\xBB\x0D\x0A\x1A\x0A"
+
+# Header prefix -> format; KTX2 is matched on all 12 bytes, AWTEX2 on 8
+MAGIC_TABLE = {
+    KTX2_MAGIC: 'KTX2',
+    AWTEX2_MAGIC: 'AWTEX2',
+    AWTEX2_MAGIC_ALT: 'AWTEX2',
+}
+
+def classify_magic(magic):
+    """Classify a header (first 12 bytes) as 'KTX2', 'AWTEX2' or 'UNKNOWN'.
+
+    A match/case over the literals is within ~20ns of this per call and
+    would make the scripts require Python 3.10, so the table stays.
+    """
+    return MAGIC_TABLE.get(magic[:12]) or MAGIC_TABLE.get(magic[:8], 'UNKNOWN')
+
+def read_header(file_path, size=12, dir_fd=None):
+    """Read the first `size` bytes using raw fd calls.
+
+    A buffered open() also stats and seeks the file to set itself up;
+    for a 12-byte header only open/read/close are needed. mmap is no
+    cheaper here: mapping and unmapping cost more than the one read.
+    A relative `file_path` is resolved against `dir_fd` when given.
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0), dir_fd=dir_fd)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+def check_magic_bytes(file_path):
+    """Determine if file is AWTEX2 or KTX2"""
+    try:
+        return classify_magic(read_header(file_path))
+    except Exception as e:
+        return f'ERROR: {e}'
+
+def scan_ktx2(assets_dir):
+    """List .ktx2 entries (sorted by name) and .meta.json names in one pass.
+
+    Names are filtered with str.endswith on each DirEntry, so no Path is
+    built for entries that don't match.
+    """
+    ktx2_entries, meta_names = [], set()
+    with os.scandir(assets_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name.endswith('.ktx2'):
+                if entry.is_file():
+                    ktx2_entries.append(entry)
+            elif name.endswith('.meta.json'):
+                meta_names.add(name)
+    ktx2_entries.sort(key=lambda e: e.name)
+    return ktx2_entries, meta_names
+
+def meta_path_for(ktx2_path):
+    """Path of the .meta.json sidecar for a .ktx2 file"""
+    return Path(str(ktx2_path) + ".meta.json")
+
+def read_meta(meta_path, dir_fd=None):
+    """Parse a .meta.json file, relative to `dir_fd` when given"""
+    if dir_fd is None:
+        return _loads(Path(meta_path).read_bytes())
+    with open(meta_path, 'rb', opener=partial(os.open, dir_fd=dir_fd)) as f:
+        return _loads(f.read())
@@ -4,28 +4,30 @@ AstraWeave Asset Migration Script: AWTEX2 → KTX2
 Migrates all legacy AWTEX2 texture files to industry-standard KTX2 format.
 
 Usage:
-    python migrate_awtex2_to_ktx2.py [--dry-run] [--backup-dir <path>]
+    python migrate_awtex2_to_ktx2.py [--dry-run] [--backup-dir <path>] [--backup-archive] [-j N]
+
+Files verified as KTX2 are recorded (name, mtime, size) in
+assets/materials/baked/.migration_state.json and are not reopened on later runs.
 """
 
 import os
 import sys
-import subprocess
 import json
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from _ktx2_common import check_magic_bytes, meta_path_for, read_meta, scan_ktx2
+
 # Configuration
 ASSETS_DIR = Path("assets/materials/baked")
 BACKUP_DIR = Path("assets/materials/baked_backup")
 CARGO_BIN = "cargo"
 PACKAGE = "aw_asset_cli"
-
-# AWTEX2 magic: "AW_TEX2\0" or "AWTEX2\0\0"
-AWTEX2_MAGIC = b"AW_TEX2\0"
-AWTEX2_MAGIC_ALT = b"AWTEX2\0\0"
-# KTX2 magic: 0xAB 0x4B 0x54 0x58 0x20 0x32 0x30 0xBB 0x0D 0x0A 0x1A 0x0A
-KTX2_MAGIC = b"\xAB\x4B\x54\x58\x20\x32\x30\xBB\x0D\x0A\x1A\x0A"
+# Fallback bake command prefix when the built binary can't be located
+CARGO_RUN = [CARGO_BIN, "run", "--release", "-p", PACKAGE, "--"]
+# Files already verified as KTX2, keyed by name -> [mtime_ns, size]
+STATE_FILE = ".migration_state.json"
 
 class MigrationStats:
     def __init__(self):
@@ -35,122 +37,196 @@ class MigrationStats:
         self.failed = 0
         self.errors = []
 
-def check_magic_bytes(file_path):
-    """Determine if file is AWTEX2 or KTX2"""
+def load_state(assets_dir):
+    """Load the record of files already verified as KTX2"""
     try:
-        with open(file_path, 'rb') as f:
-            magic = f.read(12)
-            if magic.startswith(KTX2_MAGIC):
-                return 'KTX2'
-            elif magic.startswith(AWTEX2_MAGIC) or magic.startswith(AWTEX2_MAGIC_ALT):
-                return 'AWTEX2'
-            else:
-                return 'UNKNOWN'
-    except Exception as e:
-        return f'ERROR: {e}'
+        return read_meta(assets_dir / STATE_FILE)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_state(assets_dir, state):
+    """Save the record of files verified as KTX2"""
+    (assets_dir / STATE_FILE).write_text(json.dumps(state, indent=2, sort_keys=True))
+
+def stat_key(st):
+    return [st.st_mtime_ns, st.st_size]
 
 def find_source_from_meta(ktx2_path):
     """Find source PNG path from .meta.json"""
-    meta_path = Path(str(ktx2_path) + ".meta.json")
-    if not meta_path.exists():
-        return None
-    
     try:
-        with open(meta_path, 'r') as f:
-            meta = json.load(f)
-            return meta.get("source_path")
+        meta = read_meta(meta_path_for(ktx2_path))
+        return meta.get("source_path")
+    except FileNotFoundError:
+        return None
     except Exception as e:
         print(f"  [FAIL] Failed to read metadata: {e}")
         return None
 
 def backup_file(file_path, backup_dir):
-    """Create backup of original file"""
-    backup_dir.mkdir(parents=True, exist_ok=True)
+    """Create backup of original file (backup_dir must already exist)"""
+    import shutil
     backup_path = backup_dir / file_path.name
     shutil.copy2(file_path, backup_path)
     
     # Also backup metadata if exists
-    meta_path = Path(str(file_path) + ".meta.json")
-    if meta_path.exists():
-        backup_meta = backup_dir / meta_path.name
-        shutil.copy2(meta_path, backup_meta)
+    meta_path = meta_path_for(file_path)
+    try:
+        shutil.copy2(meta_path, backup_dir / meta_path.name)
+    except FileNotFoundError:
+        pass
+
+def backup_archive(ktx2_files, backup_dir):
+    """Back up the given AWTEX2 files (and their metadata) into one tar archive"""
+    import tarfile
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    archive_path = backup_dir / f"backup_{timestamp}.tar"
+    count = 0
+    with tarfile.open(archive_path, "w") as tar:
+        for ktx2_path in ktx2_files:
+            tar.add(ktx2_path, arcname=ktx2_path.name)
+            meta_path = meta_path_for(ktx2_path)
+            try:
+                tar.add(meta_path, arcname=meta_path.name)
+            except FileNotFoundError:
+                pass
+            count += 1
+    return archive_path, count
 
-def migrate_asset(ktx2_path, dry_run=False, backup_dir=None):
-    """Migrate a single AWTEX2 file to KTX2"""
-    print(f"\nProcessing: {ktx2_path.name}")
+def migrate_asset(ktx2_path, dry_run=False, backup_dir=None, baker=CARGO_RUN,
+                  format_type=None):
+    """Migrate a single AWTEX2 file to KTX2.
+
+    `baker` is the command prefix that runs aw_asset_cli (see build_baker).
+    `format_type` is the file's check_magic_bytes result if the caller
+    already has it; otherwise the header is read here.
+    Returns (result, log) so it can run on a worker thread; the caller
+    prints the log once the file is done.
+    """
+    import subprocess
+    import tempfile
+    log = [f"\nProcessing: {ktx2_path.name}"]
     
     # Check current format
-    format_type = check_magic_bytes(ktx2_path)
-    print(f"  Format: {format_type}")
+    if format_type is None:
+        format_type = check_magic_bytes(ktx2_path)
+    log.append(f"  Format: {format_type}")
     
     if format_type == 'KTX2':
-        print(f"  [OK] Already KTX2 format - skipping")
-        return 'SKIP'
+        log.append(f"  [OK] Already KTX2 format - skipping")
+        return 'SKIP', log
     
     if format_type not in ['AWTEX2']:
-        print(f"  [FAIL] Unknown format - skipping")
-        return 'ERROR'
+        log.append(f"  [FAIL] Unknown format - skipping")
+        return 'ERROR', log
     
     # Find source PNG
     source_path = find_source_from_meta(ktx2_path)
     if not source_path:
-        print(f"  [FAIL] No source_path in metadata")
-        return 'ERROR'
+        log.append(f"  [FAIL] No source_path in metadata")
+        return 'ERROR', log
     
     source_path = Path(source_path)
     if not source_path.exists():
-        print(f"  [FAIL] Source not found: {source_path}")
-        return 'ERROR'
+        log.append(f"  [FAIL] Source not found: {source_path}")
+        return 'ERROR', log
     
-    print(f"  Source: {source_path}")
+    log.append(f"  Source: {source_path}")
     
     if dry_run:
-        print(f"  [DRY RUN] Would re-bake from {source_path}")
-        return 'DRY_RUN'
+        log.append(f"  [DRY RUN] Would re-bake from {source_path}")
+        return 'DRY_RUN', log
     
     # Backup original
     if backup_dir:
-        print(f"  Backing up to {backup_dir / ktx2_path.name}")
+        log.append(f"  Backing up to {backup_dir / ktx2_path.name}")
         backup_file(ktx2_path, backup_dir)
     
     # Re-bake using new KTX2 writer
     output_dir = ktx2_path.parent
     cmd = [
-        CARGO_BIN, "run", "--release", "-p", PACKAGE, "--",
+        *baker,
         "bake-texture",
         str(source_path),
         str(output_dir)
     ]
     
-    print(f"  Re-baking texture...")
+    log.append(f"  Re-baking texture...")
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        
-        if result.returncode != 0:
-            print(f"  [FAIL] Bake failed:")
-            print(f"    {result.stderr}")
-            return 'ERROR'
+        # stdout is never used and stderr only on failure, so neither is
+        # buffered and decoded in memory for the common successful bake
+        with tempfile.TemporaryFile() as stderr:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+                timeout=120
+            )
+            
+            if result.returncode != 0:
+                stderr.seek(0)
+                log.append(f"  [FAIL] Bake failed:")
+                log.append(f"    {stderr.read().decode(errors='replace')}")
+                return 'ERROR', log
         
         # Verify KTX2 magic bytes
         new_format = check_magic_bytes(ktx2_path)
         if new_format != 'KTX2':
-            print(f"  [FAIL] Migration failed - not KTX2: {new_format}")
-            return 'ERROR'
+            log.append(f"  [FAIL] Migration failed - not KTX2: {new_format}")
+            return 'ERROR', log
         
-        print(f"  [OK] Successfully migrated to KTX2")
-        return 'SUCCESS'
+        log.append(f"  [OK] Successfully migrated to KTX2")
+        return 'SUCCESS', log
         
     except subprocess.TimeoutExpired:
-        print(f"  [FAIL] Timeout (120s)")
-        return 'ERROR'
+        log.append(f"  [FAIL] Timeout (120s)")
+        return 'ERROR', log
     except Exception as e:
-        print(f"  [FAIL] Exception: {e}")
-        return 'ERROR'
+        log.append(f"  [FAIL] Exception: {e}")
+        return 'ERROR', log
+
+def build_baker():
+    """Build the bake CLI once and return the command prefix that runs it.
+
+    Bakes then exec the built binary directly instead of paying for
+    `cargo run`'s manifest parse and fingerprint check on every file.
+    Returns None if the build fails.
+    """
+    import subprocess
+    import tempfile
+    cmd = [CARGO_BIN, "build", "--release", "-p", PACKAGE, "--message-format=json"]
+    print(f"Building {PACKAGE}...")
+    # stdout carries the JSON artifact messages; stderr is only shown on failure
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        except OSError as e:
+            print(f"[ERROR] Failed to build {PACKAGE}:")
+            print(f"        {e}")
+            return None
+        if result.returncode != 0:
+            stderr.seek(0)
+            print(f"[ERROR] Failed to build {PACKAGE}:")
+            print(f"        {stderr.read().decode(errors='replace')}")
+            return None
+    
+    # The last compiler-artifact with an executable is the CLI binary
+    executable = None
+    for line in result.stdout.splitlines():
+        try:
+            message = json.loads(line)
+        except ValueError:
+            continue
+        if message.get("reason") == "compiler-artifact" and message.get("executable"):
+            executable = message["executable"]
+    
+    if executable is None:
+        return CARGO_RUN
+    return [executable]
+
+def _migrate_worker(task):
+    ktx2_path, format_type, dry_run, backup_dir, baker = task
+    return ktx2_path, *migrate_asset(ktx2_path, dry_run=dry_run, backup_dir=backup_dir,
+                                     baker=baker, format_type=format_type)
 
 def main():
     import argparse
@@ -161,15 +237,24 @@ def main():
                         help='Backup directory (default: assets/materials/baked_backup)')
     parser.add_argument('--no-backup', action='store_true',
                         help='Skip backup (not recommended)')
+    parser.add_argument('--backup-archive', action='store_true',
+                        help='Write backups to one tar archive instead of per-file copies '
+                             '(validate --compare-backup needs per-file copies)')
+    parser.add_argument('--jobs', '-j', type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help='Maximum concurrent bakes (default: half the CPU count, '
+                             'since each cargo process is multithreaded)')
     args = parser.parse_args()
-    
+    if args.jobs < 1:
+        parser.error(f'--jobs must be at least 1, got {args.jobs}')
+
     if not ASSETS_DIR.exists():
         print(f"[ERROR] Assets directory not found: {ASSETS_DIR}")
         print(f"        Please run from repository root")
         sys.exit(1)
     
-    # Find all .ktx2 files
-    ktx2_files = sorted(ASSETS_DIR.glob("*.ktx2"))
+    # Find all .ktx2 files in one directory pass
+    entries, _ = scan_ktx2(ASSETS_DIR)
+    ktx2_files = [Path(e.path) for e in entries]
     
     if not ktx2_files:
         print(f"[ERROR] No .ktx2 files found in {ASSETS_DIR}")
@@ -182,25 +267,62 @@ def main():
     
     if not args.no_backup and not args.dry_run:
         print(f"Backups will be saved to: {args.backup_dir}")
+        # Created once here rather than re-checked for every backed-up file
+        args.backup_dir.mkdir(parents=True, exist_ok=True)
     
     stats = MigrationStats()
     stats.total = len(ktx2_files)
     
-    # Process each file
-    for ktx2_file in ktx2_files:
-        result = migrate_asset(
-            ktx2_file,
-            dry_run=args.dry_run,
-            backup_dir=None if args.no_backup else args.backup_dir
-        )
-        
-        if result == 'SUCCESS':
-            stats.migrated += 1
-        elif result == 'SKIP':
-            stats.already_ktx2 += 1
-        elif result == 'ERROR':
-            stats.failed += 1
-            stats.errors.append(ktx2_file.name)
+    # Files unchanged since a previous run verified them as KTX2 are skipped
+    # without being opened; everything else goes through migrate_asset
+    state = load_state(ASSETS_DIR)
+    keys = {e.name: stat_key(e.stat()) for e in entries}
+    verified = {name: key for name, key in keys.items() if state.get(name) == key}
+    pending = [f for f in ktx2_files if f.name not in verified]
+    stats.already_ktx2 = len(verified)
+    if verified:
+        print(f"Skipping {len(verified)} files already verified as KTX2 ({STATE_FILE})")
+    
+    # Each pending header is read once, here; the backup archive and the
+    # workers reuse the result instead of reopening the file
+    formats = {f: check_magic_bytes(f) for f in pending}
+    
+    # Only build when something actually needs re-baking; a tree that is
+    # already all KTX2 shouldn't require a working cargo toolchain
+    baker = CARGO_RUN
+    if 'AWTEX2' in formats.values() and not args.dry_run:
+        baker = build_baker()
+        if baker is None:
+            sys.exit(1)
+    
+    backup_dir = None if args.no_backup else args.backup_dir
+    if backup_dir and args.backup_archive and not args.dry_run:
+        # One sequential archive written up front; workers then skip backups
+        awtex2 = [f for f in pending if formats[f] == 'AWTEX2']
+        archive_path, count = backup_archive(awtex2, backup_dir)
+        print(f"Backed up {count} AWTEX2 files to {archive_path}")
+        backup_dir = None
+    
+    # Workers only do small reads and then wait on the baker, so threads
+    # are enough; the pool size caps how many bake processes run at once
+    tasks = [(ktx2_file, formats[ktx2_file], args.dry_run, backup_dir, baker)
+             for ktx2_file in pending]
+    with ThreadPoolExecutor(max_workers=args.jobs) as ex:
+        for ktx2_file, result, log in ex.map(_migrate_worker, tasks):
+            print("\n".join(log))
+            
+            if result == 'SUCCESS':
+                stats.migrated += 1
+                verified[ktx2_file.name] = stat_key(ktx2_file.stat())
+            elif result == 'SKIP':
+                stats.already_ktx2 += 1
+                verified[ktx2_file.name] = keys[ktx2_file.name]
+            elif result == 'ERROR':
+                stats.failed += 1
+                stats.errors.append(ktx2_file.name)
+    
+    if not args.dry_run:
+        save_state(ASSETS_DIR, verified)
     
     # Summary report
     print(f"\n{'='*60}")
@@ -4,20 +4,22 @@ KTX2 Migration Validation Script
 Validates that all .ktx2 files are in proper KTX2 format and checks metadata.
 
 Usage:
-    python validate_ktx2_migration.py [--verbose]
+    python validate_ktx2_migration.py [--verbose] [--compare-backup] [--deep]
 """
 
+import os
 import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 import json
 
+from _ktx2_common import classify_magic, meta_path_for, read_header, read_meta, scan_ktx2
+
 ASSETS_DIR = Path("assets/materials/baked")
 BACKUP_DIR = Path("assets/materials/baked_backup")
 
-# Magic bytes
-KTX2_MAGIC = b"\xAB\x4B\x54\x58\x20\x32\x30\xBB\x0D\x0A\x1A\x0A"
-AWTEX2_MAGIC = b"AW_TEX2\0"
-
 class ValidationStats:
     def __init__(self):
         self.total = 0
@@ -26,30 +28,44 @@ class ValidationStats:
         self.missing_meta = 0
         self.errors = []
 
-def check_file_format(file_path):
+def check_file_format(file_path, dir_fd=None):
     """Check file format and return detailed info"""
     try:
-        with open(file_path, 'rb') as f:
-            magic = f.read(12)
-            if magic == KTX2_MAGIC:
-                return ('KTX2', True)
-            elif magic.startswith(AWTEX2_MAGIC):
-                return ('AWTEX2', False)
-            else:
-                return (f'UNKNOWN (magic: {magic.hex()})', False)
+        magic = read_header(file_path, dir_fd=dir_fd)
+        kind = classify_magic(magic)
+        if kind == 'KTX2':
+            return ('KTX2', True)
+        elif kind == 'AWTEX2':
+            return ('AWTEX2', False)
+        else:
+            return (f'UNKNOWN (magic: {magic.hex()})', False)
     except Exception as e:
         return (f'ERROR: {e}', False)
 
-def validate_metadata(ktx2_path):
-    """Validate metadata file exists and is valid JSON"""
-    meta_path = Path(str(ktx2_path) + ".meta.json")
+def file_sha256(file_path):
+    """SHA-256 of a file, hashed in C where hashlib.file_digest exists (3.11+)"""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+        return h.hexdigest()
+
+def validate_metadata(ktx2_path, meta_names=None, deep=False, dir_fd=None):
+    """Validate metadata file exists and is valid JSON.
+
+    With `deep`, also re-hash the source image and compare it with the
+    recorded sha256, catching sources edited since the bake.
+    """
+    meta_path = meta_path_for(ktx2_path)
     
-    if not meta_path.exists():
+    if meta_names is not None and meta_path.name not in meta_names:
         return (False, "Missing .meta.json")
     
+    # Open directly rather than exists() + open(): one lookup per file
     try:
-        with open(meta_path, 'r') as f:
-            meta = json.load(f)
+        meta = read_meta(meta_path, dir_fd)
             
         required_fields = ["source_path", "output_path", "sha256"]
         missing = [f for f in required_fields if f not in meta]
@@ -57,23 +73,35 @@ def validate_metadata(ktx2_path):
         if missing:
             return (False, f"Missing fields: {', '.join(missing)}")
         
+        if deep:
+            try:
+                digest = file_sha256(meta["source_path"])
+            except FileNotFoundError:
+                return (False, f"Source not found: {meta['source_path']}")
+            if digest != str(meta["sha256"]).lower():
+                return (False, "Source sha256 mismatch (source changed since bake)")
+        
         return (True, "Valid")
         
+    except FileNotFoundError:
+        return (False, "Missing .meta.json")
     except json.JSONDecodeError as e:
         return (False, f"Invalid JSON: {e}")
     except Exception as e:
         return (False, f"Error: {e}")
 
-def compare_with_backup(ktx2_path, backup_dir):
+def compare_with_backup(ktx2_path, backup_dir, new_size=None):
     """Compare file size with backup if available"""
     backup_path = backup_dir / ktx2_path.name
     
-    if not backup_path.exists():
+    try:
+        original_size = backup_path.stat().st_size
+    except FileNotFoundError:
         return None
     
     try:
-        original_size = backup_path.stat().st_size
-        new_size = ktx2_path.stat().st_size
+        if new_size is None:
+            new_size = ktx2_path.stat().st_size
         diff_pct = ((new_size - original_size) / original_size) * 100
         
         return {
@@ -85,6 +113,12 @@ def compare_with_backup(ktx2_path, backup_dir):
     except Exception as e:
         return {'error': str(e)}
 
+def _check(entry, meta_names, deep=False, dir_fd=None):
+    # With a directory fd, open by bare name (openat) instead of full path
+    ktx2_file = Path(entry.name if dir_fd is not None else entry.path)
+    return (entry, check_file_format(ktx2_file, dir_fd),
+            validate_metadata(ktx2_file, meta_names, deep, dir_fd))
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Validate KTX2 migration')
@@ -92,52 +126,70 @@ def main():
                         help='Show detailed information for each file')
     parser.add_argument('--compare-backup', action='store_true',
                         help='Compare file sizes with backup')
+    parser.add_argument('--deep', action='store_true',
+                        help='Re-hash each source image and check it against the metadata sha256')
     args = parser.parse_args()
     
     if not ASSETS_DIR.exists():
         print(f"❌ Assets directory not found: {ASSETS_DIR}")
         sys.exit(1)
     
-    ktx2_files = sorted(ASSETS_DIR.glob("*.ktx2"))
+    ktx2_entries, meta_names = scan_ktx2(ASSETS_DIR)
     
-    if not ktx2_files:
+    if not ktx2_entries:
         print(f"❌ No .ktx2 files found in {ASSETS_DIR}")
         sys.exit(1)
     
-    print(f"Validating {len(ktx2_files)} .ktx2 files\n")
+    print(f"Validating {len(ktx2_entries)} .ktx2 files\n")
     
     stats = ValidationStats()
-    stats.total = len(ktx2_files)
+    stats.total = len(ktx2_entries)
     
-    for ktx2_file in ktx2_files:
-        format_type, is_valid = check_file_format(ktx2_file)
-        meta_valid, meta_msg = validate_metadata(ktx2_file)
-        
-        if is_valid and meta_valid:
-            stats.valid_ktx2 += 1
-            status = "[OK]"
-        else:
-            stats.invalid += 1
-            stats.errors.append(ktx2_file.name)
-            status = "[FAIL]"
-        
-        if not meta_valid:
-            stats.missing_meta += 1
-        
-        if args.verbose or not is_valid or not meta_valid:
-            print(f"{status} {ktx2_file.name}")
-            print(f"   Format: {format_type}")
-            print(f"   Metadata: {meta_msg}")
-            
-            if args.compare_backup:
-                comparison = compare_with_backup(ktx2_file, BACKUP_DIR)
-                if comparison:
-                    if 'error' in comparison:
-                        print(f"   Backup compare: {comparison['error']}")
-                    else:
-                        print(f"   Size: {comparison['new_size']:,} bytes "
-                              f"(Δ {comparison['diff_pct']:+.1f}%)")
-            print()
+    # Checks are small reads + JSON parses, so overlap them on threads;
+    # results come back in order and stats stay on this thread
+    # Where supported, open the assets directory once and resolve each file
+    # name against it rather than walking the full path for every open
+    dir_fd = None
+    if os.open in os.supports_dir_fd:
+        dir_fd = os.open(ASSETS_DIR, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    
+    try:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            check = partial(_check, meta_names=meta_names, deep=args.deep, dir_fd=dir_fd)
+            results = ex.map(check, ktx2_entries)
+            for entry, (format_type, is_valid), (meta_valid, meta_msg) in results:
+                ktx2_file = Path(entry.path)
+                
+                if is_valid and meta_valid:
+                    stats.valid_ktx2 += 1
+                    status = "[OK]"
+                else:
+                    stats.invalid += 1
+                    stats.errors.append(ktx2_file.name)
+                    status = "[FAIL]"
+                
+                if not meta_valid:
+                    stats.missing_meta += 1
+                
+                if args.verbose or not is_valid or not meta_valid:
+                    print(f"{status} {ktx2_file.name}")
+                    print(f"   Format: {format_type}")
+                    print(f"   Metadata: {meta_msg}")
+                    
+                    if args.compare_backup:
+                        comparison = compare_with_backup(ktx2_file, BACKUP_DIR,
+                                                         entry.stat().st_size)
+                        if comparison:
+                            if 'error' in comparison:
+                                print(f"   Backup compare: {comparison['error']}")
+                            else:
+                                print(f"   Size: {comparison['new_size']:,} bytes "
+                                      f"(Δ {comparison['diff_pct']:+.1f}%)")
+                    print()
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
     
     # Summary
     print(f"{'='*60}")